@@ -1,15 +1,18 @@
 class Dfa:
     """Representation of deterministic finite automata (DFA)."""
 
-    def __init__(self, delta, accept_states, init_state):
+    def __init__(self, delta, accept_states, init_state, labels=None):
         """
         delta: a transition table. Should be an array of hashes, where
             delta[s][x] gives next state for state s on input x.
         accept_states: list of accept states
+        labels: optional map from each accept state to its acceptance class,
+            for automata that sort accepted strings into several classes
         """
         self._delta = delta
         self._accept_states = accept_states
         self._init_state = init_state
+        self._labels = labels
 
     def states(self):
         return list(range(len(self._delta)))
@@ -18,6 +21,10 @@ class Dfa:
     def accept_states(self):
         return self._accept_states
 
+    @property
+    def labels(self):
+        return self._labels
+
     @property
     def init_state(self):
         return self._init_state
@@ -50,11 +57,38 @@ class Dfa:
         """Return True if the automaton accepts s."""
         return self.run(s) in self.accept_states
 
-    def _minimal_partition(self):
-        """Partition the DFA states according to equivalence."""
+    def classify(self, s):
+        """Return the acceptance class of s, or None if s is rejected.
+
+        Only meaningful for DFAs with acceptance labels.
+        """
+        if self._labels is None:
+            raise ValueError("classify requires a DFA with acceptance labels")
+        state = self.run(s)
+        if state not in self.accept_states:
+            return None
+        return self._labels[state]
+
+    def _initial_partition(self):
+        """Split states into non-accept states and accept states per class."""
         non_accept_states = [s for s in self.states()
                              if s not in self.accept_states]
-        p = Partition([list(self.accept_states), non_accept_states])
+        if self._labels is None:
+            return Partition([list(self.accept_states), non_accept_states])
+        classes = {}
+        class_order = []
+        for s in sorted(self.accept_states):
+            label = self._labels[s]
+            if label not in classes:
+                classes[label] = []
+                class_order.append(label)
+            classes[label].append(s)
+        return Partition([classes[label] for label in class_order] +
+                         [non_accept_states])
+
+    def _minimal_partition(self):
+        """Partition the DFA states according to equivalence."""
+        p = self._initial_partition()
         # will break when we stop making progress
         while True:
             # two states are equivalent if they have map each input to the same
@@ -80,6 +114,9 @@ class Dfa:
         UIUC's CS 373 from Spring 2010):
         https://courses.engr.illinois.edu/cs373/sp2010/lectures/lect_11.pdf.
 
+        If the DFA has acceptance labels, only states in the same acceptance
+        class are merged and the result carries over the labels.
+
         Does not modify self.
         """
         # The heavy lifting of computing which DFA states to merge is handled
@@ -111,8 +148,16 @@ class Dfa:
         for accept_q in self.accept_states:
             accept_states.add(state_renaming[accept_q])
 
+        # Likewise, accept states are only merged within an acceptance class,
+        # so each new accept state inherits the label of its old states.
+        labels = None
+        if self._labels is not None:
+            labels = {}
+            for accept_q in self.accept_states:
+                labels[state_renaming[accept_q]] = self._labels[accept_q]
+
         # Assemble the new DFA
-        return Dfa(delta, accept_states, init)
+        return Dfa(delta, accept_states, init, labels)
 
 class Partition:
     def __init__(self, sets):
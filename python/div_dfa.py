@@ -2,7 +2,7 @@
 
 from dfa import Dfa
 
-def divisible_by(n):
+def _mod_delta(n):
     delta = []
     for s in range(n):
         s_delta = {}
@@ -10,4 +10,18 @@ def divisible_by(n):
             x = str(d)
             s_delta[x] = (s * 10 + d)%n
         delta.append(s_delta)
-    return Dfa(delta, set([0]), 0)
+    return delta
+
+def divisible_by(n):
+    return congruent_to(n, 0)
+
+def congruent_to(n, r):
+    """DFA accepting numbers m with m % n == r."""
+    return Dfa(_mod_delta(n), set([r]), 0)
+
+def residues_mod(n):
+    """DFA accepting every number, labelled with its residue mod n."""
+    labels = {}
+    for s in range(n):
+        labels[s] = s
+    return Dfa(_mod_delta(n), set(range(n)), 0, labels)
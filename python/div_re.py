@@ -2,14 +2,50 @@
 
 from __future__ import print_function
 
-from div_dfa import divisible_by
+from div_dfa import congruent_to, divisible_by, residues_mod
 import gnfa
 import regex
 
-def div_re(n):
+def div_re(n, compact=False):
     m = divisible_by(n).minimal()
     r = gnfa.Gnfa.dfa_re(m)
-    return "^" + r.to_re() + "$"
+    return "^" + r.to_re(compact=compact) + "$"
+
+def _residue_sub_res(n, compact, shared):
+    if shared is None:
+        shared = n % 2 != 0 and n % 5 != 0
+    if shared:
+        m = residues_mod(n).minimal()
+        rs = gnfa.Gnfa.dfa_label_res(m)
+        rs = [rs[k] for k in range(n)]
+    else:
+        rs = [gnfa.Gnfa.dfa_re(congruent_to(n, k).minimal())
+              for k in range(n)]
+    return regex.to_res(rs, compact=compact)
+
+def residue_res(n, compact=False, shared=None):
+    """Regexes matching numbers congruent to each residue r mod n.
+
+    The r-th regex matches numbers m with m % n == r.
+
+    With shared=True, all of them come from one GNFA elimination over the
+    DFA labelled with every residue. With shared=False, each residue is
+    generated separately from its own minimized DFA. By default the shared
+    pass is used only when n is coprime to 10: otherwise a single residue's
+    DFA minimizes to far fewer states than the labelled one (which can never
+    merge residues), and separate generation is much smaller and faster.
+    """
+    return ["^" + r + "$" for r in _residue_sub_res(n, compact, shared)]
+
+def residue_re(n, compact=False, shared=None):
+    """A single regex sorting numbers by their residue mod n.
+
+    The match for m has exactly one named group set, r<k> where k = m % n, so
+    match.lastgroup gives the residue class. See residue_res for shared.
+    """
+    groups = ["(?P<r{}>{})".format(k, r)
+              for k, r in enumerate(_residue_sub_res(n, compact, shared))]
+    return "^(?:" + "|".join(groups) + ")$"
 
 if __name__ == "__main__":
     import argparse
@@ -17,8 +53,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("n", type=int,
                         help="modulus to test divisibility against")
+    parser.add_argument("--compact", action="store_true",
+                        help="emit a size-optimized regex")
+    parser.add_argument("--residues", action="store_true",
+                        help="emit one regex per residue class mod n")
 
     args = parser.parse_args()
 
-    r = div_re(args.n)
-    print(r)
+    if args.residues:
+        for r in residue_res(args.n, compact=args.compact):
+            print(r)
+    else:
+        r = div_re(args.n, compact=args.compact)
+        print(r)
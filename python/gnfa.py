@@ -26,6 +26,15 @@ class Gnfa:
 
     @classmethod
     def from_dfa(cls, dfa):
+        return cls._from_dfa(dfa, lambda s: 'final')
+
+    @classmethod
+    def _from_dfa(cls, dfa, final_state):
+        """Convert a DFA to a GNFA.
+
+        final_state maps each accept state to the final state it should
+        transition to; the default is a single final state.
+        """
         delta = {}
         for s in range(len(dfa._delta)):
             s_delta = {}
@@ -37,7 +46,7 @@ class Gnfa:
         init_delta[dfa.init_state] = regex.Eps()
         delta['init'] = init_delta
         for accept_state in dfa.accept_states:
-            delta[accept_state]['final'] = regex.Eps()
+            delta[accept_state][final_state(accept_state)] = regex.Eps()
         return Gnfa(delta, 'init', 'final')
 
     def transition(self, s, next_s):
@@ -104,12 +113,34 @@ class Gnfa:
                 return s
         return None
 
-    def rip_all(self):
-        """Reduce the GNFA by removing all but the initial and final states."""
-        q_rip = self._arbitrary_state()
+    def _cheapest_state(self):
+        """Returns the interior state whose removal adds the fewest edges."""
+        cheapest = None
+        cheapest_cost = None
+        for s in self.delta.keys():
+            if s == self._init:
+                continue
+            cost = len(self.incoming_edges(s)) * len(self.delta[s])
+            if cheapest is None or cost < cheapest_cost:
+                cheapest = s
+                cheapest_cost = cost
+        return cheapest
+
+    def rip_all(self, cheapest_first=False):
+        """Reduce the GNFA by removing all but the initial and final states.
+
+        By default states are removed in an arbitrary order. With
+        cheapest_first, each step removes the state with the fewest paths
+        through it, which keeps the regexes smaller when the GNFA has many
+        final states.
+        """
+        next_state = self._arbitrary_state
+        if cheapest_first:
+            next_state = self._cheapest_state
+        q_rip = next_state()
         while q_rip is not None:
             self.rip_state(q_rip)
-            q_rip = self._arbitrary_state()
+            q_rip = next_state()
 
     @classmethod
     def dfa_re(cls, dfa):
@@ -125,3 +156,27 @@ class Gnfa:
             raise ValueError('GNFA must transition only to final state')
         r = m.transition(m._init, m._terminal)
         return regex.simplify(r)
+
+    @classmethod
+    def dfa_label_res(cls, dfa):
+        """Convert a labelled DFA to a regular expression per acceptance class.
+
+        Each class gets its own final state, so a single pass of ripping out
+        the interior states produces all of the regexes at once, and they are
+        simplified together so shared subterms are only simplified once.
+        Returns a map from each label to its simplified regex.
+
+        Every class must be reachable from the initial state, since an
+        unreachable class has no regex; a ValueError is raised otherwise.
+        """
+        m = cls._from_dfa(dfa, lambda s: ('final', dfa.labels[s]))
+        m.rip_all(cheapest_first=True)
+        if list(m.delta.keys()) != [m._init]:
+            raise ValueError('GNFA must have only init state')
+        labels = list(set(dfa.labels.values()))
+        rs = [m.transition(m._init, ('final', label)) for label in labels]
+        rs = regex.simplify_all(rs)
+        for label, r in zip(labels, rs):
+            if r.is_empty():
+                raise ValueError('no reachable accept state for class {}'.format(label))
+        return dict(zip(labels, rs))
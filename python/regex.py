@@ -1,3 +1,10 @@
+# Precedence levels used by the compact emitter. A rendered regex at some
+# level can be used anywhere that level or a lower one is expected without
+# parenthesizing it.
+_PREC_ALT = 0
+_PREC_SEQ = 1
+_PREC_ATOM = 2
+
 class Regex:
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -5,6 +12,20 @@ class Regex:
         else:
             return False
 
+    def to_re(self, compact=False):
+        """Render as a standard (Python) regular expression.
+
+        The default rendering parenthesizes every sequence and alternation.
+        With compact=True the output is optimized for size instead: literal
+        groups use ranges, repetition uses +/{k} quantifiers, and groups are
+        only added where precedence requires them. In both modes the result
+        can safely be concatenated with other regexes.
+
+        Note that compact output uses \\d for the ten digits; compile with
+        re.ASCII if non-ASCII digits must be rejected.
+        """
+        return to_res([self], compact)[0]
+
 class Literal(Regex):
     def __init__(self, c):
         self.c = c
@@ -12,9 +33,14 @@ class Literal(Regex):
     def __repr__(self):
         return "Lit({})".format(self.c)
 
-    def to_re(self):
+    def _to_re(self, memo):
         return self.c
 
+    def _compact_re(self, memo):
+        if len(self.c) == 1:
+            return self.c, _PREC_ATOM
+        return self.c, _PREC_SEQ
+
     def is_empty(self):
         return False
 
@@ -28,10 +54,19 @@ class LiteralGroup(Regex):
     def __repr__(self):
         return "LitGroup({})".format(self.cs)
 
-    def to_re(self):
+    def _to_re(self, memo):
         assert len(self.cs) > 0, "empty literal groups are unrepresentable"
         return "[{}]".format("".join(self.cs))
 
+    def _compact_re(self, memo):
+        assert len(self.cs) > 0, "empty literal groups are unrepresentable"
+        cs = sorted(set(self.cs))
+        if cs == [str(d) for d in range(10)]:
+            return "\\d", _PREC_ATOM
+        if len(cs) == 1:
+            return cs[0], _PREC_ATOM
+        return "[{}]".format(_char_ranges(cs)), _PREC_ATOM
+
     def is_empty(self):
         return len(self.cs) == 0
 
@@ -43,9 +78,12 @@ class Empty(Regex):
     def __repr__(self):
         return "Empty()"
 
-    def to_re(self):
+    def _to_re(self, memo):
         raise ValueError("empty regex cannot be represented as standard re")
 
+    def _compact_re(self, memo):
+        return self._to_re(memo)
+
     def is_empty(self):
         return True
 
@@ -60,10 +98,15 @@ class Star(Regex):
     def __repr__(self):
         return "Star({})".format(self.r)
 
-    def to_re(self):
+    def _to_re(self, memo):
         if self.is_eps():
             return "(?:)"
-        return "{}*".format(self.r.to_re())
+        return "{}*".format(_render(self.r, False, memo))
+
+    def _compact_re(self, memo):
+        if self.is_eps():
+            return "", _PREC_SEQ
+        return _repeat(self.r, 0, None, memo), _PREC_SEQ
 
     def is_empty(self):
         return False
@@ -79,15 +122,26 @@ class Alternation(Regex):
     def __repr__(self):
         return "Alternation({})".format(self.rs)
 
-    def to_re(self):
+    def _to_re(self, memo):
         sub_res = []
         for r in self.rs:
             if r.is_eps():
                 sub_res.append("")
             else:
-                sub_res.append(r.to_re())
+                sub_res.append(_render(r, False, memo))
         return "(?:{})".format("|".join(sub_res))
 
+    def _compact_re(self, memo):
+        if len(self.rs) == 1:
+            return _render(self.rs[0], True, memo)
+        sub_res = []
+        for r in self.rs:
+            if r.is_eps():
+                sub_res.append("")
+            else:
+                sub_res.append(_paren(_render(r, True, memo), _PREC_ALT))
+        return "|".join(sub_res), _PREC_ALT
+
     def is_empty(self):
         # every possibility must be empty
         for r in self.rs:
@@ -110,8 +164,41 @@ class Seq(Regex):
     def __repr__(self):
         return "Seq({})".format(self.rs)
 
-    def to_re(self):
-        return "(?:{})".format("".join([r.to_re() for r in self.rs]))
+    def _to_re(self, memo):
+        return "(?:{})".format("".join([_render(r, False, memo) for r in self.rs]))
+
+    def _compact_re(self, memo):
+        # Group adjacent copies of the same regex into runs (r, min, max),
+        # where a Star contributes zero to unboundedly many copies. This turns
+        # X X* into X+ and X X X into X{3}.
+        runs = []
+        for r in self.rs:
+            if r.is_eps():
+                continue
+            if isinstance(r, Star):
+                r, lo, hi = r.r, 0, None
+            else:
+                lo, hi = 1, 1
+            if runs and runs[-1][0] == r:
+                _, last_lo, last_hi = runs[-1]
+                if hi is not None and last_hi is not None:
+                    hi = last_hi + hi
+                else:
+                    hi = None
+                runs[-1] = (r, last_lo + lo, hi)
+            else:
+                runs.append((r, lo, hi))
+        if len(runs) == 0:
+            return "", _PREC_SEQ
+        if len(runs) == 1 and runs[0][1:] == (1, 1):
+            return _render(runs[0][0], True, memo)
+        sub_res = []
+        for r, lo, hi in runs:
+            if (lo, hi) == (1, 1):
+                sub_res.append(_paren(_render(r, True, memo), _PREC_SEQ))
+            else:
+                sub_res.append(_repeat(r, lo, hi, memo))
+        return "".join(sub_res), _PREC_SEQ
 
     def is_empty(self):
         for r in self.rs:
@@ -125,6 +212,79 @@ class Seq(Regex):
                 return False
         return True
 
+def to_res(rs, compact=False):
+    """Render a list of regexes; see Regex.to_re.
+
+    Equivalent to rendering each one, but subterms shared between them are
+    only rendered once.
+    """
+    memo = {}
+    res = []
+    for r in rs:
+        if compact:
+            res.append(_paren(_render(r, True, memo), _PREC_SEQ))
+        else:
+            res.append(_render(r, False, memo))
+    return res
+
+def _render(r, compact, memo):
+    """Render r, caching results in memo by object identity.
+
+    Regexes from GNFA elimination share subterms heavily, so this avoids
+    rendering the same subterm over and over.
+    """
+    key = (id(r), compact)
+    if key not in memo:
+        if compact:
+            rendered = r._compact_re(memo)
+        else:
+            rendered = r._to_re(memo)
+        # keep r alive so its id is not reused while rendering
+        memo[key] = (r, rendered)
+    return memo[key][1]
+
+def _paren(rendered, prec):
+    """Parenthesize a rendered (re, level) pair if it binds looser than prec."""
+    s, level = rendered
+    if level < prec:
+        return "(?:{})".format(s)
+    return s
+
+def _char_ranges(cs):
+    """Render sorted, distinct characters for a character class using ranges.
+
+    Only runs of at least three consecutive characters become ranges, since
+    shorter ones are no longer when written out.
+    """
+    parts = []
+    i = 0
+    while i < len(cs):
+        j = i
+        while j + 1 < len(cs) and ord(cs[j + 1]) == ord(cs[j]) + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append("{}-{}".format(cs[i], cs[j]))
+        else:
+            parts.extend(cs[i:j + 1])
+        i = j + 1
+    return "".join(parts)
+
+def _repeat(r, lo, hi, memo):
+    """Render r repeated between lo and hi times (hi None for unbounded).
+
+    Picks the shortest of writing the copies out and using a quantifier.
+    """
+    atom = _paren(_render(r, True, memo), _PREC_ATOM)
+    if hi is None:
+        if lo == 0:
+            return atom + "*"
+        options = [atom * (lo - 1) + atom + "+",
+                   "{}{{{},}}".format(atom, lo)]
+    else:
+        assert lo == hi, "only exact or unbounded repetition is rendered"
+        options = [atom * lo, "{}{{{}}}".format(atom, lo)]
+    return min(options, key=len)
+
 def Eps():
     """The language of just the empty string."""
     return Star(Empty())
@@ -177,7 +337,7 @@ def _alt_common_prefix_with(prefix, rs):
         return new_rs
     return None
 
-def _simplify(r):
+def _simplify(r, memo=None):
     """Simplify a regular expression.
 
     Returns a tuple (r_new, simpler) where r_new is equivalent to r but
@@ -185,7 +345,20 @@ def _simplify(r):
     any simplifications were made.
 
     This is a low-level function that implements one step of simplification.
+
+    Regexes produced by GNFA elimination share subterms heavily, so results
+    are cached in memo by object identity; each shared subterm is then only
+    simplified once per step, and its simplification is shared in the result.
     """
+    if memo is None:
+        memo = {}
+    key = id(r)
+    if key not in memo:
+        # keep r alive so its id is not reused during this step
+        memo[key] = (r, _simplify_step(r, memo))
+    return memo[key][1]
+
+def _simplify_step(r, memo):
     if isinstance(r, Literal):
         return r, False
     if isinstance(r, LiteralGroup):
@@ -197,7 +370,7 @@ def _simplify(r):
     if isinstance(r, Empty):
         return r, False
     if isinstance(r, Star):
-        r, simpler = _simplify(r.r)
+        r, simpler = _simplify(r.r, memo)
         return Star(r), simpler
     if isinstance(r, Alternation):
         rs = []
@@ -206,7 +379,7 @@ def _simplify(r):
             if r.is_empty():
                 alt_simpler = True
                 continue
-            r, simpler = _simplify(r)
+            r, simpler = _simplify(r, memo)
             alt_simpler = alt_simpler or simpler
             if isinstance(r, Alternation):
                 rs.extend(r.rs)
@@ -230,7 +403,7 @@ def _simplify(r):
             if r.is_eps():
                 seq_simpler = True
                 continue
-            r, simpler = _simplify(r)
+            r, simpler = _simplify(r, memo)
             seq_simpler = seq_simpler or simpler
             if isinstance(r, Seq):
                 rs.extend(r.rs)
@@ -254,7 +427,18 @@ def simplify(r):
     - using LiteralGroups ([abc] in normal regex syntax) instead of an OR of literals
     - unwrapping sequences and ORs of single regexes
     """
-    r, simpler = _simplify(r)
+    return simplify_all([r])[0]
+
+def simplify_all(rs):
+    """Simplify a list of regular expressions together.
+
+    Equivalent to simplifying each one, but work on subterms shared between
+    them is only done once.
+    """
+    simpler = True
     while simpler:
-        r, simpler = _simplify(r)
-    return r
+        memo = {}
+        results = [_simplify(r, memo) for r in rs]
+        rs = [r for r, _ in results]
+        simpler = any(simpler for _, simpler in results)
+    return rs
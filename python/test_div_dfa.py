@@ -3,7 +3,8 @@
 import re
 import unittest
 
-from div_dfa import divisible_by
+from dfa import Dfa
+from div_dfa import divisible_by, residues_mod
 
 class TestDivDfa(unittest.TestCase):
 
@@ -43,5 +44,23 @@ class TestDivDfa(unittest.TestCase):
     def test_mimimized_14(self):
         self._testModulusMatch(14)
 
+    def _testResidueClassify(self, n):
+        dfa = residues_mod(n).minimal()
+
+        for m in range(1000):
+            self.assertEqual(dfa.classify(str(m)), m % n,
+                             msg="wrong residue of {} mod {}".format(m, n))
+
+    def test_residues_minimized_4(self):
+        self._testResidueClassify(4)
+
+    def test_residues_minimized_14(self):
+        self._testResidueClassify(14)
+
+    def test_classify_unlabelled(self):
+        dfa = Dfa([{'a': 0}], set([0]), 0)
+        with self.assertRaises(ValueError):
+            dfa.classify('a')
+
 if __name__ == "__main__":
     unittest.main()
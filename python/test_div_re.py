@@ -9,12 +9,15 @@ from __future__ import print_function
 import re
 import unittest
 
-from div_re import div_re
+import gnfa
+
+from dfa import Dfa
+from div_re import div_re, residue_re, residue_res
 
 class TestDivRe(unittest.TestCase):
 
-    def _testModulus(self, n):
-        r = re.compile(div_re(n))
+    def _testModulus(self, n, compact=False):
+        r = re.compile(div_re(n, compact=compact))
 
         for m in range(1000):
             regex_div = True if r.match(str(m)) else False
@@ -46,5 +49,86 @@ class TestDivRe(unittest.TestCase):
     def test_mod_100(self):
         self._testModulus(100)
 
+    def test_compact_mod_3(self):
+        self._testModulus(3, compact=True)
+
+    def test_compact_mod_4(self):
+        self._testModulus(4, compact=True)
+
+    def test_compact_mod_7(self):
+        self._testModulus(7, compact=True)
+
+    def test_compact_mod_10(self):
+        self._testModulus(10, compact=True)
+
+    def test_compact_mod_14(self):
+        self._testModulus(14, compact=True)
+
+    def test_compact_mod_100(self):
+        self._testModulus(100, compact=True)
+
+    def test_compact_is_shorter(self):
+        for n in [2, 4, 7, 10]:
+            self.assertLess(len(div_re(n, compact=True)), len(div_re(n)))
+
+    def _testResidues(self, n, shared=None):
+        rs = [re.compile(r) for r in residue_res(n, shared=shared)]
+        combined = re.compile(residue_re(n, compact=True, shared=shared))
+
+        for m in range(1000):
+            matches = [k for k, r in enumerate(rs) if r.match(str(m))]
+            self.assertEqual(matches, [m % n],
+                             msg="wrong residue classes of {} mod {}".format(m, n))
+            group = combined.match(str(m)).lastgroup
+            self.assertEqual(group, "r{}".format(m % n),
+                             msg="wrong residue group of {} mod {}".format(m, n))
+
+    def test_residues_1(self):
+        self._testResidues(1)
+
+    def test_residues_3(self):
+        self._testResidues(3)
+
+    def test_residues_4(self):
+        self._testResidues(4)
+
+    def test_residues_5(self):
+        self._testResidues(5)
+
+    def test_residues_6(self):
+        self._testResidues(6)
+
+    def test_residues_7(self):
+        self._testResidues(7)
+
+    def test_residues_10(self):
+        self._testResidues(10)
+
+    def test_residues_20(self):
+        self._testResidues(20)
+
+    def test_residues_shared_4(self):
+        self._testResidues(4, shared=True)
+
+    def test_residues_separate_7(self):
+        self._testResidues(7, shared=False)
+
+    def _residuesSize(self, n, shared=None):
+        return sum(len(r) for r in residue_res(n, shared=shared))
+
+    def test_residues_size(self):
+        # the default strategy is never larger than separate generation
+        for n in [3, 5, 7, 8, 9, 10, 12, 20]:
+            self.assertLessEqual(self._residuesSize(n),
+                                 self._residuesSize(n, shared=False),
+                                 msg="residues mod {} too large".format(n))
+        self.assertLess(self._residuesSize(10), 1000)
+        self.assertLess(self._residuesSize(20), 5000)
+
+    def test_unreachable_class(self):
+        dfa = Dfa([{'a': 0}, {'a': 1}], set([0, 1]), 0, {0: 'x', 1: 'y'})
+        with self.assertRaises(ValueError):
+            gnfa.Gnfa.dfa_label_res(dfa)
+
 if __name__ == "__main__":
     unittest.main()